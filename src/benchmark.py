@@ -0,0 +1,70 @@
+import argparse
+import random
+import string
+import sys
+import sysconfig
+import time
+from search import Search
+
+
+def gil_enabled() -> bool:
+    """
+    Whether the GIL is active, always True before free-threaded builds existed
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def random_words(count: int, min_length: int, max_length: int, alphabet: str) -> list[str]:
+    return ["".join(random.choices(alphabet, k=random.randint(min_length, max_length))) for _ in range(count)]
+
+
+def random_text(length: int, alphabet: str) -> str:
+    return "".join(random.choices(alphabet + " \n", k=length))
+
+
+def timed(function, *args) -> float:
+    start_time = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start_time
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the shared compiled automaton on a thread pool")
+    parser.add_argument("--patterns", type=int, default=5_000, help="Number of random patterns")
+    parser.add_argument("--texts", type=int, default=16, help="Number of texts to scan")
+    parser.add_argument("--length", type=int, default=200_000, help="Characters per text")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Thread pool sizes to compare")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    random.seed(args.seed)
+    alphabet = string.ascii_lowercase[:8]
+
+    patterns = random_words(args.patterns, 2, 8, alphabet)
+    texts = [random_text(args.length, alphabet) for _ in range(args.texts)]
+    total = args.texts * args.length
+
+    build = "free-threaded" if sysconfig.get_config_var("Py_GIL_DISABLED") else "GIL"
+    print(f"Python {sys.version.split()[0]} ({build} build, GIL {'enabled' if gil_enabled() else 'disabled'})")
+    print(f"{len(patterns):,} patterns, {args.texts} texts x {args.length:,} characters\n")
+
+    search = Search()
+    search.add_patterns(patterns)
+    automaton = search.compile()
+
+    seconds = timed(lambda: [search.search(text) for text in texts])
+    print(f"Search.search (1 thread): {seconds:.2f}s, {total / seconds / 1e6:.2f} M chars/s")
+
+    baseline = None
+    for threads in args.threads:
+        seconds = timed(automaton.search_many, texts, threads)
+        baseline = baseline or seconds
+        print(f"CompiledAutomaton ({threads} thread{'s' if threads > 1 else ''}): {seconds:.2f}s, {total / seconds / 1e6:.2f} M chars/s, speedup x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
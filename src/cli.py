@@ -0,0 +1,109 @@
+import argparse
+import json
+import sys
+from lineindex import LineIndex
+from loader import PatternLoader
+from search import Search
+from shard import PARTITIONS, ShardedSearch
+from trie import format_stats
+
+
+def print_progress(stage: str, count: int) -> None:
+    print(f"[{stage}] {count:,}", file=sys.stderr)
+
+
+def format_report(report: dict[str, int | float]) -> str:
+    lines = [
+        f"Patterns read: {report['read']:,}",
+        f"Unique patterns: {report['unique']:,}",
+        f"Duplicates: {report['duplicates']:,}",
+        f"Build time: {report['seconds']:.2f}s",
+    ]
+    if "shard_seconds" in report:
+        lines.append(f"Slowest shard build: {report['shard_seconds']:.2f}s")
+    if "peak_memory" in report:
+        label = "Peak memory (largest shard)" if "shard_seconds" in report else "Peak memory"
+        lines.append(f"{label}: {report['peak_memory'] / (1024 * 1024):.1f} MiB")
+    return "\n".join(lines)
+
+
+def read_text(path: str) -> str:
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file).get("text", "")
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Aho-Corasick Pattern Search (command line)")
+    parser.add_argument("patterns", help="Pattern file: newline-delimited (.txt), gzip (.gz) or JSON (.json)")
+    parser.add_argument("text", nargs="?", help="Text file to search (.txt or JSON with a \"text\" field)")
+    parser.add_argument("--progress", action="store_true", help="Report build progress on stderr")
+    parser.add_argument("--progress-every", type=positive_int, default=100_000, help="Patterns between progress reports")
+    parser.add_argument("--memory", action="store_true", help="Measure peak memory of the build (slower)")
+    parser.add_argument("--shards", type=int, default=1, help="Split the patterns into N shards built in parallel processes")
+    parser.add_argument("--partition", choices=list(PARTITIONS), default="first_char", help="How patterns are assigned to shards")
+    parser.add_argument("--locations", action="store_true", help="Print line:column and a context snippet for every match")
+    parser.add_argument("--context", type=int, default=30, help="Characters of context on each side of a snippet")
+    parser.add_argument("--stats", action="store_true", help="Print the size report of the automaton (with --shards, the shards are built in this process to keep their tries)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+
+    loader = PatternLoader(
+        progress=print_progress if args.progress else None,
+        progress_every=args.progress_every,
+        track_memory=args.memory,
+    )
+    if args.shards > 1:
+        processes = 1 if args.stats else None
+        search = ShardedSearch(shards=args.shards, partition=args.partition, processes=processes, loader=loader)
+        report = search.add_patterns_from_file(args.patterns)
+        sizes = [len(patterns) for patterns in search.shard_patterns]
+        print(format_report(report))
+        print(f"Shards: {args.shards} ({args.partition}), patterns per shard: {sizes}")
+        if args.stats:
+            for index, shard in enumerate(search.searches):
+                print(f"\nShard {index}:\n{format_stats(shard.trie.stats())}")
+    else:
+        search = Search()
+        report = search.add_patterns_from_file(args.patterns, loader)
+        print(format_report(report))
+        if args.stats:
+            print(f"\n{format_stats(search.trie.stats())}")
+
+    if args.text is None:
+        return
+
+    text = read_text(args.text)
+    results = search.search(text)
+    line_index = LineIndex.from_text(text) if args.locations else None
+    sorted_results = sorted(results.items(), key=lambda item: item[1]['count'], reverse=True)
+
+    print()
+    for pattern, data in sorted_results:
+        if data['count'] == 0:
+            continue
+        print(f"Pattern: {pattern}")
+        print(f"Count: {data['count']}")
+        if line_index is None:
+            print(f"Positions: {data['positions']}\n")
+            continue
+
+        for line, column, snippet in line_index.match_locations(text, pattern, data['positions'], args.context):
+            print(f"  {line}:{column}  {snippet}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
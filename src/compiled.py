@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Iterable
+from trie import Trie
+
+
+class CompiledAutomaton:
+    """
+    Frozen, read-only Aho-Corasick automaton compiled from a Trie.
+    Scanning only reads the tables, so one instance can be shared by many threads
+    without locks or per-thread copies
+    """
+
+    __slots__ = ("_children", "_fail", "_output", "_patterns")
+
+    def __init__(self, trie: Trie):
+        table = trie.to_table()
+        fail = table["fail"]
+        output_sets: list[tuple[str, ...]] = []
+
+        # BFS order, the fail target of a node is always compiled before it.
+        # Each node keeps the patterns of its whole fail chain, without duplicates
+        empty: tuple[str, ...] = ()
+        for node_output, end_of_word, fail_index in zip(table["output"], table["end_of_word"], fail):
+            inherited = output_sets[fail_index] if fail_index > 0 else empty
+            if not end_of_word or not node_output:
+                # Most nodes match nothing of their own, share the fail target's tuple
+                output_sets.append(inherited)
+            elif not inherited:
+                output_sets.append(tuple(node_output))
+            else:
+                output_sets.append(tuple(dict.fromkeys((*node_output, *inherited))))
+
+        self._freeze(table["children"], tuple(fail), tuple(output_sets), frozenset(table["patterns"]))
+
+    def _freeze(self, children: Iterable[dict[str, int]], fail: tuple[int, ...], output: tuple[tuple[str, ...], ...], patterns: frozenset[str]) -> None:
+        # Read-only views over the transition maps, no thread can change a shared automaton
+        object.__setattr__(self, "_children", tuple(MappingProxyType(transitions) for transitions in children))
+        object.__setattr__(self, "_fail", fail)
+        object.__setattr__(self, "_output", output)
+        object.__setattr__(self, "_patterns", patterns)
+
+    def __reduce__(self):
+        """
+        Pickle the flat tables (e.g. to send a shard built in a worker process),
+        unpickling only wraps the transition maps again
+        """
+        children = [dict(transitions) for transitions in self._children]
+        return _restore_automaton, (children, self._fail, self._output, self._patterns)
+
+    @classmethod
+    def from_patterns(cls, patterns: Iterable[str]) -> "CompiledAutomaton":
+        """
+        Build and compile an automaton from patterns
+        """
+        trie = Trie()
+        for pattern in patterns:
+            trie.insert(pattern)
+        trie.build_failure_links()
+        return cls(trie)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledAutomaton is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("CompiledAutomaton is read-only")
+
+    @property
+    def patterns(self) -> frozenset[str]:
+        return self._patterns
+
+    def search(self, text: str) -> dict[str, dict[str, int]]:
+        """
+        Search the text using all the patterns, same results as Search.search
+        """
+        children = self._children
+        fail = self._fail
+        output = self._output
+        results: dict[str, dict[str, int]] = {pattern: {"count": 0, "positions": []} for pattern in self._patterns}
+
+        state = 0
+        for position, char in enumerate(text.lower()):
+            while True:
+                next_state = children[state].get(char)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+
+            for pattern in output[state]:
+                result = results[pattern]
+                result["count"] += 1
+                result["positions"].append(position)
+
+        return results
+
+    def search_many(self, texts: Iterable[str], threads: int | None = None) -> list[dict[str, dict[str, int]]]:
+        """
+        Search many texts on a thread pool sharing this automaton, results are in input order.
+        Threads scan in parallel on free-threaded Python builds
+        """
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(self.search, texts))
+
+
+def _restore_automaton(children: list[dict[str, int]], fail: tuple[int, ...], output: tuple[tuple[str, ...], ...], patterns: frozenset[str]) -> CompiledAutomaton:
+    automaton = CompiledAutomaton.__new__(CompiledAutomaton)
+    automaton._freeze(children, fail, output, patterns)
+    return automaton
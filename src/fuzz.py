@@ -0,0 +1,245 @@
+import argparse
+import random
+import sys
+import time
+from itertools import chain
+from typing import Callable
+from lineindex import LineIndex
+from loader import PatternLoader, normalize_patterns
+from search import Search
+from shard import ShardedSearch
+
+Results = dict[str, dict[str, int]]
+# Builds a search from patterns. A search that has a "batch" attribute takes a list
+# of that many texts and returns their results, the others take a single text
+Engine = Callable[[list[str]], Callable]
+
+ASCII = "abc"
+UNICODE = "aåäßéıİσςΣ中文😀́"
+
+# Fixed (kind, patterns, text) cases run before the random ones
+REGRESSIONS = [
+    # "İ" lowercases to 2 characters, the locations after it on the same line were shifted by one
+    ("lowercase expansion", ["she", "he"], "first line\nsecond line\nhe said İt she\n"),
+]
+
+
+def naive_search(patterns: list[str], text: str) -> Results:
+    """
+    Reference search: check every pattern at every position of the lowered text
+    """
+    text = text.lower()
+    results: Results = {}
+    for pattern in patterns:
+        positions = [i + len(pattern) - 1 for i in range(len(text)) if text.startswith(pattern, i)]
+        results[pattern] = {"count": len(positions), "positions": positions}
+    return results
+
+
+def build_search(patterns: list[str]) -> Callable[[str], Results]:
+    search = Search()
+    search.add_patterns(patterns)
+    return search.search
+
+
+def build_loader(patterns: list[str]) -> Callable[[str], Results]:
+    search = Search()
+    search.trie, _ = PatternLoader().load(patterns)
+    return search.search
+
+
+def build_compiled(patterns: list[str]) -> Callable[[str], Results]:
+    search = Search()
+    search.add_patterns(patterns)
+    return search.compile().search
+
+
+THREADS = 4
+
+
+def build_compiled_threads(patterns: list[str]) -> Callable[[list[str]], list[Results]]:
+    search = Search()
+    search.add_patterns(patterns)
+    automaton = search.compile()
+
+    # Scans a batch of texts in one call, run() times the call per text and checks
+    # every result outside the timing
+    def search_threads(texts: list[str]) -> list[Results]:
+        return automaton.search_many(texts, threads=THREADS)
+
+    search_threads.batch = THREADS
+    return search_threads
+
+
+def build_sharded(partition: str) -> Engine:
+    def build(patterns: list[str]) -> Callable[[str], Results]:
+        # Shards are built in this process so the harness does not spawn a pool per case
+        search = ShardedSearch(shards=3, partition=partition, processes=1)
+        search.add_patterns(patterns)
+        return search.search
+
+    return build
+
+
+ENGINES: dict[str, Engine] = {
+    "search": build_search,
+    "loader": build_loader,
+    "compiled": build_compiled,
+    "compiled_threads": build_compiled_threads,
+    "sharded_first_char": build_sharded("first_char"),
+    "sharded_hash": build_sharded("hash"),
+}
+
+
+def random_string(rng: random.Random, alphabet: str, min_length: int, max_length: int) -> str:
+    return "".join(rng.choices(alphabet, k=rng.randint(min_length, max_length)))
+
+
+def random_case(rng: random.Random) -> tuple[str, list[str], str]:
+    """
+    Random or adversarial (kind, patterns, text) case
+    """
+    kind = rng.choice(["random", "unicode", "prefix_suffix", "repeated", "empty", "long"])
+    alphabet = UNICODE if kind == "unicode" else ASCII
+
+    if kind == "prefix_suffix":
+        # Every prefix and suffix of a few words
+        words = [random_string(rng, alphabet, 3, 8) for _ in range(rng.randint(1, 3))]
+        patterns = [word[:i] for word in words for i in range(1, len(word) + 1)]
+        patterns += [word[i:] for word in words for i in range(len(word))]
+        text = "".join(rng.choice(words + [random_string(rng, alphabet, 1, 3)]) for _ in range(rng.randint(0, 50)))
+    elif kind == "repeated":
+        # Overlapping matches everywhere: a, aa, aaa ... against a run of a
+        char = rng.choice(alphabet)
+        patterns = [char * i for i in range(1, rng.randint(2, 12))]
+        text = char * rng.randint(0, 300)
+    elif kind == "empty":
+        patterns = rng.choice([[], [random_string(rng, alphabet, 1, 3)]])
+        text = rng.choice(["", random_string(rng, alphabet, 0, 5)])
+    elif kind == "long":
+        long_pattern = random_string(rng, alphabet, 200, 1000)
+        patterns = [long_pattern, long_pattern[:50], long_pattern[-50:]] + [random_string(rng, alphabet, 1, 4) for _ in range(20)]
+        text = random_string(rng, alphabet, 0, 500) + long_pattern + random_string(rng, alphabet, 0, 2000)
+    else:
+        patterns = [random_string(rng, alphabet, 1, 6) for _ in range(rng.randint(1, 60))]
+        text = random_string(rng, alphabet + alphabet.upper() + " \n", 0, 2000)
+
+    # Engines that bulk load normalize patterns, so every engine gets normalized ones
+    patterns = list(dict.fromkeys(normalize_patterns(patterns)))
+    return kind, patterns, text
+
+
+def naive_locations(patterns: list[str], text: str) -> dict[str, list[tuple[int, int]]]:
+    """
+    Reference (line, column) of every match, each lowered character is mapped back
+    to its original one by lowering the text one character at a time
+    """
+    # Lowercasing depends on context (final sigma) but lengths do not, so the whole
+    # text gives the characters and single characters give the mapping
+    lowered = text.lower()
+    original = []
+    for i, char in enumerate(text):
+        original.extend([i] * len(char.lower()))
+
+    locations = {}
+    for pattern in patterns:
+        starts = [original[i] for i in range(len(lowered)) if lowered.startswith(pattern, i)]
+        locations[pattern] = [(text.count("\n", 0, start) + 1, start - text.rfind("\n", 0, start)) for start in starts]
+    return locations
+
+
+def check_locations(patterns: list[str], text: str, results: Results) -> list[str]:
+    """
+    Patterns whose LineIndex locations differ from the reference, or whose snippet
+    does not frame the matched text
+    """
+    expected = naive_locations(patterns, text)
+    line_index = LineIndex.from_text(text)
+    mismatched = []
+    for pattern, data in results.items():
+        locations = line_index.match_locations(text, pattern, data["positions"])
+        spans = [line_index.match_span(pattern, position) for position in data["positions"]]
+        framed = all(f"[{text[start:end]}]" in snippet and "\n" not in snippet.replace(text[start:end], "") for (start, end), (_, _, snippet) in zip(spans, locations))
+        if [(line, column) for line, column, _ in locations] != expected[pattern] or not framed:
+            mismatched.append(pattern)
+    return mismatched
+
+
+def describe(value: str, limit: int = 80) -> str:
+    return repr(value if len(value) <= limit else value[:limit] + "...")
+
+
+def run(cases: int, seed: int, engines: list[str]) -> bool:
+    """
+    Compare the engines against the naive reference on random cases, print
+    the first mismatch of each engine and the timing summary. Returns True if all match
+    """
+    rng = random.Random(seed)
+    build_time = dict.fromkeys(engines, 0.0)
+    search_time = dict.fromkeys(engines, 0.0)
+    failed: set[str] = set()
+    locations_failed = False
+
+    regressions = ((kind, list(patterns), text) for kind, patterns, text in REGRESSIONS)
+    random_cases = (random_case(rng) for _ in range(cases))
+    for case, (kind, patterns, text) in enumerate(chain(regressions, random_cases)):
+        expected = naive_search(patterns, text)
+
+        if not locations_failed:
+            mismatched = check_locations(patterns, text, expected)
+            if mismatched:
+                locations_failed = True
+                print(f"MISMATCH line index (seed {seed}, case {case}, {kind})")
+                print(f"  text: {describe(text)}")
+                print(f"  differing patterns: {describe(repr(mismatched))}")
+
+        for name in engines:
+            if name in failed:
+                continue
+
+            start_time = time.perf_counter()
+            search = ENGINES[name](patterns)
+            build_time[name] += time.perf_counter() - start_time
+
+            batch = getattr(search, "batch", None)
+            start_time = time.perf_counter()
+            outputs = search([text] * batch) if batch else [search(text)]
+            search_time[name] += (time.perf_counter() - start_time) / len(outputs)
+
+            results = next((output for output in outputs if output != expected), expected)
+            if results != expected:
+                failed.add(name)
+                mismatched = sorted(pattern for pattern in expected.keys() | results.keys() if expected.get(pattern) != results.get(pattern))
+                print(f"MISMATCH {name} (seed {seed}, case {case}, {kind})")
+                print(f"  patterns: {describe(repr(patterns))}")
+                print(f"  text: {describe(text)}")
+                print(f"  differing patterns: {describe(repr(mismatched))}")
+
+    reference = search_time.get("search")
+    print(f"\n{len(REGRESSIONS)} regression and {cases} random cases, seed {seed}")
+    print(f"Line index locations: {'FAIL' if locations_failed else 'ok'}\n")
+    print(f"{'engine':<20}{'result':<10}{'build (s)':>12}{'search (s)':>12}{'speedup':>10}")
+    for name in engines:
+        result = "FAIL" if name in failed else "ok"
+        speedup = f"x{reference / search_time[name]:.2f}" if reference and search_time[name] else "-"
+        print(f"{name:<20}{result:<10}{build_time[name]:>12.3f}{search_time[name]:>12.3f}{speedup:>10}")
+
+    return not failed and not locations_failed
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the search engines against a naive reference")
+    parser.add_argument("--cases", type=int, default=200, help="Number of random cases")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed, reuse it to reproduce a mismatch")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES), help="Engines to compare")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if not run(args.cases, args.seed, args.engines):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
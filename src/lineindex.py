@@ -0,0 +1,123 @@
+from bisect import bisect_right
+
+
+class LoweredOffsets:
+    """
+    Maps positions in text.lower() back to the original text. Some characters get
+    longer when lowercased (e.g. "İ" becomes 2 characters), only those are recorded
+    """
+
+    def __init__(self):
+        self.lowered_starts: list[int] = []
+        self.original: list[int] = []
+        self.extra: list[int] = []
+        self.total_extra: list[int] = []
+
+    def add(self, text: str) -> None:
+        """
+        Record the expanding characters of a text
+        """
+        if len(text.lower()) == len(text):
+            return
+
+        total = 0
+        for i, char in enumerate(text):
+            extra = len(char.lower()) - 1
+            if extra:
+                self.lowered_starts.append(i + total)
+                self.original.append(i)
+                self.extra.append(extra)
+                total += extra
+                self.total_extra.append(total)
+
+    def to_original(self, position: int) -> int:
+        """
+        Original position of the character that produced the lowered position
+        """
+        k = bisect_right(self.lowered_starts, position) - 1
+        if k < 0:
+            return position
+        if position <= self.lowered_starts[k] + self.extra[k]:
+            return self.original[k]
+        return position - self.total_extra[k]
+
+
+class LineIndex:
+    """
+    Offsets of the line starts of a text, resolves character positions to
+    (line, column) with binary search. Lines and columns start at 1.
+    Positions returned by Search.search are in the lowercased text, match_span
+    converts them back to the original text
+    """
+
+    def __init__(self, line_starts: list[int] | None = None, length: int = 0, offsets: LoweredOffsets | None = None):
+        self.line_starts: list[int] = line_starts if line_starts is not None else [0]
+        self.length: int = length
+        self.offsets: LoweredOffsets = offsets if offsets is not None else LoweredOffsets()
+
+    @classmethod
+    def from_text(cls, text: str) -> "LineIndex":
+        """
+        Build the index in one pass over the text (str.find runs in C)
+        """
+        line_starts = [0]
+        find = text.find
+        position = find("\n")
+        while position != -1:
+            line_starts.append(position + 1)
+            position = find("\n", position + 1)
+
+        offsets = LoweredOffsets()
+        offsets.add(text)
+        return cls(line_starts, len(text), offsets)
+
+    def locate(self, position: int) -> tuple[int, int]:
+        """
+        (line, column) of a character position
+        """
+        line = bisect_right(self.line_starts, position)
+        return line, position - self.line_starts[line - 1] + 1
+
+    def line_span(self, line: int) -> tuple[int, int]:
+        """
+        Start and end positions of a line, the end excludes the newline
+        """
+        start = self.line_starts[line - 1]
+        if line < len(self.line_starts):
+            return start, self.line_starts[line] - 1
+        return start, self.length
+
+    def snippet(self, text: str, start: int, end: int, width: int = 30) -> str:
+        """
+        Context around text[start:end], at most width characters on each side and
+        never past the line the match starts or ends on. Only the snippet is copied
+        """
+        line_start, _ = self.line_span(self.locate(start)[0])
+        _, line_end = self.line_span(self.locate(max(start, end - 1))[0])
+
+        left = max(line_start, start - width)
+        right = min(line_end, end + width)
+        prefix = "..." if left > line_start else ""
+        suffix = "..." if right < line_end else ""
+        return f"{prefix}{text[left:start]}[{text[start:end]}]{text[end:right]}{suffix}"
+
+    def match_span(self, pattern: str, position: int) -> tuple[int, int]:
+        """
+        Start and end of a match in the original text, position is the match end
+        position returned by Search.search (in the lowercased text)
+        """
+        start = self.offsets.to_original(position - len(pattern) + 1)
+        end = self.offsets.to_original(position) + 1
+        return start, end
+
+    def match_locations(self, text: str, pattern: str, positions: list[int], width: int = 30) -> list[tuple[int, int, str]]:
+        """
+        (line, column, snippet) of each match, positions are the match end positions
+        returned by Search.search
+        """
+        locations = []
+        for position in positions:
+            start, end = self.match_span(pattern, position)
+            line, column = self.locate(start)
+            locations.append((line, column, self.snippet(text, start, end, width)))
+        return locations
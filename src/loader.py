@@ -0,0 +1,150 @@
+import gc
+import gzip
+import json
+import time
+import tracemalloc
+from typing import Callable, Iterable, Iterator
+from trie import Trie
+
+
+def open_pattern_file(path: str):
+    """
+    Open a pattern file as text, gzip files (.gz) are decompressed while reading
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_patterns(path: str) -> Iterator[str]:
+    """
+    Stream raw patterns from a newline-delimited file (optionally gzip) or a JSON file
+    with a "patterns" list or comma separated string
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as file:
+            patterns = json.load(file).get("patterns", [])
+        if isinstance(patterns, str):
+            patterns = patterns.split(",")
+        yield from patterns
+        return
+
+    with open_pattern_file(path) as file:
+        for line in file:
+            yield line
+
+
+def normalize_patterns(patterns: Iterable[str]) -> Iterator[str]:
+    """
+    Strip and lowercase patterns, skipping empty ones
+    """
+    for pattern in patterns:
+        pattern = pattern.strip().lower()
+        if pattern:
+            yield pattern
+
+
+class PatternLoader:
+    """
+    Bulk pattern loader. Streams patterns, deduplicates and normalizes them,
+    then inserts them into a Trie in sorted order
+    """
+
+    def __init__(self, progress: Callable[[str, int], None] | None = None, progress_every: int = 100_000, track_memory: bool = False):
+        if progress_every < 1:
+            raise ValueError("Progress interval must be at least 1.")
+
+        self.progress = progress
+        self.progress_every = progress_every
+        self.track_memory = track_memory
+
+    def _report(self, stage: str, count: int) -> None:
+        if self.progress is not None:
+            self.progress(stage, count)
+
+    def _read(self, patterns: Iterable[str]) -> tuple[list[str], int]:
+        """
+        Read and deduplicate patterns, returns the sorted unique patterns and the number read
+        """
+        unique: set[str] = set()
+        read = 0
+        for pattern in normalize_patterns(patterns):
+            unique.add(pattern)
+            read += 1
+            if read % self.progress_every == 0:
+                self._report("read", read)
+        self._report("read", read)
+
+        # Sort in place so only a single list of references is kept besides the set
+        ordered = list(unique)
+        del unique
+        ordered.sort()
+        return ordered, read
+
+    def _insert(self, trie: Trie, ordered: list[str]) -> int:
+        """
+        Insert sorted patterns into the Trie, reporting progress along the way.
+        Returns the number of patterns that were not already in the Trie
+        """
+        before = len(trie.patterns)
+        insert = trie.insert
+        for i, pattern in enumerate(ordered, 1):
+            insert(pattern)
+            if i % self.progress_every == 0:
+                self._report("insert", i)
+
+        self._report("insert", len(ordered))
+        return len(trie.patterns) - before
+
+    def load(self, patterns: Iterable[str], trie: Trie | None = None) -> tuple[Trie, dict[str, int | float]]:
+        """
+        Build a Trie (with failure links) from an iterable of raw patterns.
+        Returns the Trie and a report of the build
+        """
+        if trie is None:
+            trie = Trie()
+
+        started_tracing = False
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+
+        # The nodes link to each other (parent, children, fail), so cyclic GC would
+        # rescan millions of them during the build without ever freeing one
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start_time = time.perf_counter()
+            ordered, read = self._read(patterns)
+            inserted = self._insert(trie, ordered)
+            del ordered
+
+            trie.build_failure_links()
+            self._report("failure links", inserted)
+            elapsed = time.perf_counter() - start_time
+
+            peak = tracemalloc.get_traced_memory()[1] if self.track_memory else None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+            if started_tracing:
+                tracemalloc.stop()
+
+        report: dict[str, int | float] = {
+            "read": read,
+            "unique": inserted,
+            "duplicates": read - inserted,
+            "patterns": len(trie.patterns),
+            "seconds": elapsed,
+        }
+
+        if peak is not None:
+            report["peak_memory"] = peak
+
+        return trie, report
+
+    def load_file(self, path: str, trie: Trie | None = None) -> tuple[Trie, dict[str, int | float]]:
+        """
+        Build a Trie from a pattern file, see iter_patterns for the supported formats
+        """
+        return self.load(iter_patterns(path), trie)
@@ -4,7 +4,8 @@ import matplotlib.pyplot as plt
 import networkx as nx
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from search import Search
-from trie import Trie
+from lineindex import LineIndex
+from trie import Trie, format_stats
 import json
 
 class AhoCorasickApp(tk.Tk):
@@ -59,6 +60,9 @@ class AhoCorasickApp(tk.Tk):
         visualize_button = tk.Button(button_frame, text="Visualize Pattern", font=("Helvetica", 12), command=self.visualize_patterns)
         visualize_button.pack(side=tk.LEFT, padx=(0, 10))
 
+        stats_button = tk.Button(button_frame, text="Automaton Stats", font=("Helvetica", 12), command=self.show_stats)
+        stats_button.pack(side=tk.LEFT, padx=(0, 10))
+
         json_button = tk.Button(button_frame, text="Input using JSON", font=("Helvetica", 12), command=self.input_using_json)
         json_button.pack(side=tk.LEFT)
 
@@ -96,6 +100,7 @@ class AhoCorasickApp(tk.Tk):
         patterns = rawpattern.lower().split(',')
         self.search.add_patterns([p.strip().lower() for p in patterns if p.strip()])
         results = self.search.search(text.lower())
+        line_index = LineIndex.from_text(text)
         sorted_results = sorted(results.items(), key=lambda item: item[1]['count'], reverse=True)
 
         # Create a new window to display the results
@@ -133,7 +138,9 @@ class AhoCorasickApp(tk.Tk):
                 results_text.insert(tk.END, f"Pattern: {pattern}\n")
                 results_text.insert(tk.END, f"Count: {data['count']}\n")
                 if data['count'] != 0:
-                    results_text.insert(tk.END, f"Positions: {data['positions']}\n\n")
+                    results_text.insert(tk.END, f"Positions: {data['positions']}\n")
+                    locations = ["{}:{}".format(*line_index.locate(line_index.match_span(pattern, position)[0])) for position in data['positions']]
+                    results_text.insert(tk.END, f"Line:Column: {', '.join(locations)}\n\n")
                 else:
                     results_text.insert(tk.END, "\n")
 
@@ -141,18 +148,16 @@ class AhoCorasickApp(tk.Tk):
         highlighted_text = tk.Text(self.results_window, height=15, width=80, font=("Arial", 12), bg="#ffffff", padx=10, pady=10, borderwidth=2, relief="groove")
         highlighted_text.pack(pady=(10, 0), fill=tk.BOTH, expand=True)
 
-        # Insert text and highlight patterns
+        # Insert text and highlight patterns at the found positions
         highlighted_text.insert(tk.END, text)
-        for pattern in results.keys():
-            start_idx = '1.0'
-            while True:
-                start_idx = highlighted_text.search(pattern, start_idx, tk.END, nocase=True)
-                if not start_idx:
-                    break
-                end_idx = f"{start_idx}+{len(pattern)}c"
+        for pattern, data in results.items():
+            highlighted_text.tag_configure(pattern, background="yellow", foreground="black")
+            for position in data['positions']:
+                start, end = line_index.match_span(pattern, position)
+                line, column = line_index.locate(start)
+                start_idx = f"{line}.{column - 1}"
+                end_idx = f"{start_idx}+{end - start}c"
                 highlighted_text.tag_add(pattern, start_idx, end_idx)
-                highlighted_text.tag_configure(pattern, background="yellow", foreground="black")
-                start_idx = end_idx
 
 
     def visualize_patterns(self):
@@ -168,6 +173,30 @@ class AhoCorasickApp(tk.Tk):
         visualizer = TrieVisualizer(self.search.trie)
         visualizer.grab_set()
 
+    def show_stats(self):
+        self.search.reset()
+
+        rawpattern = self.pattern_input.get("1.0", tk.END).strip()
+        if not rawpattern or rawpattern == "pattern1, pattern2, pattern3, ...":
+            messagebox.showwarning("Input Error", "Pattern input cannot be empty.")
+            return
+        patterns = rawpattern.lower().split(',')
+
+        self.search.add_patterns([p.strip() for p in patterns if p.strip()])
+
+        stats_window = tk.Toplevel(self)
+        stats_window.title("Automaton Stats")
+        stats_window.geometry("600x500")
+        stats_window.configure(padx=20, pady=20)
+
+        stats_title_label = tk.Label(stats_window, text="Automaton Stats", font=("Helvetica", 16, "bold"))
+        stats_title_label.pack(pady=(10, 20))
+
+        stats_text = tk.Text(stats_window, font=("Courier", 11), bg="#f0f0f0", padx=10, pady=10, borderwidth=2, relief="groove", wrap=tk.WORD)
+        stats_text.pack(fill=tk.BOTH, expand=True)
+        stats_text.insert(tk.END, format_stats(self.search.trie.stats()))
+        stats_text.config(state=tk.DISABLED)
+
     def input_using_json(self):
         file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
         if not file_path:
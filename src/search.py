@@ -1,4 +1,6 @@
 from trie import Trie, TrieNode
+from loader import PatternLoader
+from compiled import CompiledAutomaton
 
 class Search:
     """
@@ -23,6 +25,21 @@ class Search:
             self.trie.insert(pattern)
         self.trie.build_failure_links()
 
+    def add_patterns_from_file(self, path: str, loader: PatternLoader | None = None) -> dict[str, int | float]:
+        """
+        Bulk load patterns from a file into an empty trie, returns the build report
+        """
+        if loader is None:
+            loader = PatternLoader()
+        self.trie, report = loader.load_file(path)
+        return report
+
+    def compile(self) -> CompiledAutomaton:
+        """
+        Frozen copy of the current automaton that can be shared across threads
+        """
+        return CompiledAutomaton(self.trie)
+
     def search(self, text: str) -> dict[str, dict[str, int]]:
         """
         Search the text using all the patterns
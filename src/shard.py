@@ -0,0 +1,205 @@
+import gc
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable
+from loader import PatternLoader, iter_patterns, normalize_patterns
+from compiled import CompiledAutomaton
+from search import Search
+
+
+def shard_by_first_char(pattern: str, shards: int) -> int:
+    """
+    Shard index from the first character of the pattern
+    """
+    return ord(pattern[0]) % shards
+
+
+def shard_by_hash(pattern: str, shards: int) -> int:
+    """
+    Shard index from a stable hash of the pattern (crc32, the same in every process)
+    """
+    return zlib.crc32(pattern.encode("utf-8")) % shards
+
+
+PARTITIONS = {
+    "first_char": shard_by_first_char,
+    "hash": shard_by_hash,
+}
+
+
+def _shard_loader(index: int, loader: PatternLoader) -> PatternLoader:
+    """
+    Loader with the settings of loader, its progress reports are prefixed with the shard number
+    """
+    progress = None
+    if loader.progress is not None:
+        progress = lambda stage, count: loader.progress(f"shard {index} {stage}", count)
+    return PatternLoader(progress, loader.progress_every, loader.track_memory)
+
+
+def _build_shard(index: int, patterns: list[str], loader: PatternLoader) -> tuple[CompiledAutomaton, dict[str, int | float]]:
+    """
+    Build and compile one shard's automaton, runs in a worker process.
+    The compiled automaton pickles as flat tables, so the parent can search it
+    without rebuilding any node. The reported time includes the compilation
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start_time = time.perf_counter()
+        trie, report = _shard_loader(index, loader).load(patterns)
+        automaton = CompiledAutomaton(trie)
+        report["seconds"] = time.perf_counter() - start_time
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return automaton, report
+
+
+class ShardedSearch:
+    """
+    Aho-Corasick Search over a pattern set split into shards, each shard has its own
+    automaton. Shards are built in parallel processes and results are merged so they
+    match a single automaton search
+    """
+
+    def __init__(self, shards: int = 4, partition: str = "first_char", processes: int | None = None, loader: PatternLoader | None = None):
+        if shards < 1:
+            raise ValueError("Number of shards must be at least 1.")
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown partition '{partition}', use one of: {', '.join(PARTITIONS)}")
+
+        self.shards = shards
+        self.partition = partition
+        self.processes = processes
+        # Progress and memory settings for the shard builds, its progress callback is
+        # sent to the worker processes so it must be picklable (a module level function)
+        self.loader = loader if loader is not None else PatternLoader()
+        self.report: dict[str, int | float] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Reset every shard to be empty
+        """
+        self.shard_patterns: list[set[str]] = [set() for _ in range(self.shards)]
+        # A shard built in this process keeps its Search (and Trie), a shard built in
+        # a worker process is a CompiledAutomaton, both give the same search results
+        self.searches: list[Search | CompiledAutomaton] = [Search() for _ in range(self.shards)]
+
+    def shard_of(self, pattern: str) -> int:
+        """
+        Shard index a pattern belongs to
+        """
+        return PARTITIONS[self.partition](pattern, self.shards)
+
+    def add_patterns(self, patterns: Iterable[str]) -> list[int]:
+        """
+        Normalize and add patterns, then rebuild only the shards whose patterns changed.
+        Returns the indexes of the rebuilt shards, the build report is kept in self.report
+        """
+        start_time = time.perf_counter()
+        changed = set()
+        read = 0
+        added = 0
+        for pattern in normalize_patterns(patterns):
+            read += 1
+            if read % self.loader.progress_every == 0 and self.loader.progress is not None:
+                self.loader.progress("read", read)
+
+            index = self.shard_of(pattern)
+            if pattern not in self.shard_patterns[index]:
+                self.shard_patterns[index].add(pattern)
+                changed.add(index)
+                added += 1
+
+        if self.loader.progress is not None:
+            self.loader.progress("read", read)
+
+        changed = sorted(changed)
+        build_report = self.rebuild(changed)
+
+        self.report = {
+            "read": read,
+            "unique": added,
+            "duplicates": read - added,
+            "patterns": sum(len(shard) for shard in self.shard_patterns),
+            "seconds": time.perf_counter() - start_time,
+            "shards_rebuilt": len(changed),
+            **build_report,
+        }
+        return changed
+
+    def add_patterns_from_file(self, path: str) -> dict[str, int | float]:
+        """
+        Add patterns streamed from a file, see loader.iter_patterns for the supported formats.
+        Returns the build report
+        """
+        self.add_patterns(iter_patterns(path))
+        return self.report
+
+    def remove_patterns(self, patterns: Iterable[str]) -> list[int]:
+        """
+        Remove patterns and rebuild only the shards that lost patterns.
+        Returns the indexes of the rebuilt shards
+        """
+        changed = set()
+        for pattern in normalize_patterns(patterns):
+            index = self.shard_of(pattern)
+            if pattern in self.shard_patterns[index]:
+                self.shard_patterns[index].discard(pattern)
+                changed.add(index)
+
+        changed = sorted(changed)
+        self.rebuild(changed)
+        return changed
+
+    def rebuild(self, indexes: list[int] | None = None) -> dict[str, int | float]:
+        """
+        Rebuild the automaton of the given shards (default: all), one process per shard.
+        Returns the slowest shard build time and, when tracked, the largest shard peak memory
+        """
+        if indexes is None:
+            indexes = list(range(self.shards))
+        if not indexes:
+            return {}
+
+        work = [sorted(self.shard_patterns[i]) for i in indexes]
+        reports = []
+        if len(indexes) == 1 or self.processes == 1:
+            # No process boundary, the loaded Trie is used as it is
+            for index, patterns in zip(indexes, work):
+                search = Search()
+                search.trie, report = _shard_loader(index, self.loader).load(patterns)
+                self.searches[index] = search
+                reports.append(report)
+        else:
+            workers = min(len(indexes), self.processes) if self.processes else len(indexes)
+            # Results are unpickled into millions of dicts, cyclic GC would rescan them meanwhile
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for index, (automaton, report) in zip(indexes, executor.map(_build_shard, indexes, work, repeat(self.loader))):
+                        self.searches[index] = automaton
+                        reports.append(report)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+
+        combined: dict[str, int | float] = {"shard_seconds": max(report["seconds"] for report in reports)}
+        if self.loader.track_memory:
+            combined["peak_memory"] = max(report["peak_memory"] for report in reports)
+        return combined
+
+    def search(self, text: str) -> dict[str, dict[str, int]]:
+        """
+        Search the text in every shard and merge the results.
+        Shards hold disjoint patterns so the merge is a plain union
+        """
+        results: dict[str, dict[str, int]] = {}
+        for search in self.searches:
+            results.update(search.search(text))
+        return results
@@ -1,17 +1,45 @@
-from collections import deque
+from collections import Counter, deque
+import struct
+import sys
 import networkx as nx
 
 class TrieNode:
     """
-    Trie Node, parameter: name (default: None)
+    Trie Node, parameter: name (default: None), parent (default: None), char (default: None)
+
+    When no name is given, the name (the prefix the node represents) is rebuilt
+    from the parent chain on access instead of being stored on every node
     """
 
-    def __init__(self, name: str | None = None):
+    __slots__ = ("children", "end_of_word", "fail", "output", "parent", "char", "_name")
+
+    def __init__(self, name: str | None = None, parent: "TrieNode | None" = None, char: str | None = None):
         self.children: dict[str, TrieNode] = {}
         self.end_of_word: bool = False
         self.fail: TrieNode = None
         self.output: list[str] = []
-        self.name: str = name
+        self.parent: TrieNode | None = parent
+        self.char: str | None = char
+        self._name: str | None = name
+
+    @property
+    def name(self) -> str | None:
+        """
+        Prefix represented by the node
+        """
+        if self._name is not None or self.parent is None:
+            return self._name
+
+        chars = []
+        node = self
+        while node.parent is not None:
+            chars.append(node.char)
+            node = node.parent
+        return "".join(reversed(chars))
+
+    @name.setter
+    def name(self, value: str | None) -> None:
+        self._name = value
 
 
 class Trie:
@@ -28,17 +56,18 @@ class Trie:
         Add a word to the Trie
         """
         current_node = self.root
-        for i, char in enumerate(word):
-            node_name = f"{word[:i+1]}"
-
-            if char not in current_node.children:
-                current_node.children[char] = TrieNode(name=node_name)
+        for char in word:
+            child_node = current_node.children.get(char)
+            if child_node is None:
+                child_node = TrieNode(parent=current_node, char=char)
+                current_node.children[char] = child_node
 
-            current_node = current_node.children[char]
+            current_node = child_node
 
-        current_node.end_of_word = True
-        current_node.output.append(word)
-        self.patterns.add(word) 
+        if word not in self.patterns:
+            current_node.end_of_word = True
+            current_node.output.append(word)
+            self.patterns.add(word)
 
     def build_failure_links(self) -> None:
         """
@@ -64,6 +93,96 @@ class Trie:
                     child_node.fail = fail_node.children[char]
                     child_node.output.extend(child_node.fail.output)
 
+    def to_table(self) -> dict:
+        """
+        Flatten the Trie into index based tables (BFS order, root is 0)
+        """
+        nodes = [self.root]
+        index = {id(self.root): 0}
+        children = []
+        for node in nodes:
+            transitions = {}
+            for char, child_node in node.children.items():
+                transitions[char] = index[id(child_node)] = len(nodes)
+                nodes.append(child_node)
+            children.append(transitions)
+
+        return {
+            "children": children,
+            "fail": [index[id(node.fail)] if node.fail is not None else -1 for node in nodes],
+            "output": [node.output for node in nodes],
+            "end_of_word": [node.end_of_word for node in nodes],
+            "patterns": list(self.patterns),
+        }
+
+    def stats(self) -> dict:
+        """
+        Size report of the automaton: node and edge counts, depth, branching and
+        fail chain distributions, output entries and memory per component (bytes)
+        """
+        depth_histogram = Counter()
+        branching = Counter()
+        fail_chain = Counter()
+        output_entries = 0
+        named_nodes = 0
+        name_characters = 0
+        measured = {"nodes": 0, "children": 0, "output": 0, "names": 0}
+
+        # BFS so a node's fail target (always shallower) has its chain length already
+        chain_length = {id(self.root): 0}
+        queue = deque([(self.root, 0)])
+        nodes = 0
+        while queue:
+            node, depth = queue.popleft()
+            nodes += 1
+            depth_histogram[depth] += 1
+            branching[len(node.children)] += 1
+            output_entries += len(node.output)
+
+            if node.fail is not None:
+                chain_length[id(node)] = chain_length.get(id(node.fail), 0) + 1
+            fail_chain[chain_length.get(id(node), 0)] += 1
+
+            measured["nodes"] += sys.getsizeof(node)
+            measured["children"] += sys.getsizeof(node.children)
+            measured["output"] += sys.getsizeof(node.output)
+            if node._name is not None:
+                named_nodes += 1
+                name_characters += len(node._name)
+                measured["names"] += sys.getsizeof(node._name)
+
+            for child_node in node.children.values():
+                queue.append((child_node, depth + 1))
+
+        measured["patterns"] = sys.getsizeof(self.patterns) + sum(sys.getsizeof(pattern) for pattern in self.patterns)
+        measured["total"] = sum(measured.values())
+
+        edges = nodes - 1
+        pointer = struct.calcsize("P")
+        estimated = {
+            "nodes": nodes * sys.getsizeof(TrieNode()),
+            # Size of a dict only depends on its number of entries, so the branching counts are enough
+            "children": sum(count * sys.getsizeof({str(i): i for i in range(children)}) for children, count in branching.items()),
+            "output": nodes * sys.getsizeof([]) + output_entries * pointer,
+            # Only explicitly named nodes (the root) store a name, the others rebuild it on access
+            "names": named_nodes * sys.getsizeof("") + name_characters,
+            "patterns": sum(len(pattern) + sys.getsizeof("") for pattern in self.patterns) + len(self.patterns) * 2 * pointer,
+        }
+        estimated["total"] = sum(estimated.values())
+
+        return {
+            "patterns": len(self.patterns),
+            "nodes": nodes,
+            "edges": edges,
+            "output_entries": output_entries,
+            "max_depth": max(depth_histogram),
+            "depth_histogram": dict(sorted(depth_histogram.items())),
+            "branching": dict(sorted(branching.items())),
+            "fail_chain": dict(sorted(fail_chain.items())),
+            "memory_estimated": estimated,
+            "memory_measured": measured,
+        }
+
     def visualize(self) -> nx.MultiDiGraph:
         """
         Create a networkx MultiDiGraph for the trie. Used by matplotlib to visualize the trie
@@ -127,3 +246,32 @@ class Trie:
                 print_node(child, prefix + char)
 
         print_node(self.root, "")
+
+
+def format_stats(stats: dict) -> str:
+    """
+    Readable text of a Trie.stats() report
+    """
+    def histogram(counts: dict[int, int]) -> str:
+        return ", ".join(f"{key}: {value}" for key, value in counts.items())
+
+    def size(value: int) -> str:
+        return f"{value / 1024:,.1f} KiB"
+
+    lines = [
+        f"Patterns: {stats['patterns']:,}",
+        f"Nodes: {stats['nodes']:,}",
+        f"Edges: {stats['edges']:,}",
+        f"Output entries: {stats['output_entries']:,}",
+        f"Max depth: {stats['max_depth']}",
+        "",
+        f"Depth histogram (depth: nodes): {histogram(stats['depth_histogram'])}",
+        f"Branching factor (children: nodes): {histogram(stats['branching'])}",
+        f"Fail chain length (length: nodes): {histogram(stats['fail_chain'])}",
+        "",
+        "Memory (estimated / measured):",
+    ]
+    for component, measured in stats["memory_measured"].items():
+        estimated = stats["memory_estimated"][component]
+        lines.append(f"  {component}: {size(estimated)} / {size(measured)}")
+    return "\n".join(lines)